@@ -1,10 +1,12 @@
 import asyncio
-import json
+import logging
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
 from typing import Annotated, Dict, List, Optional, TypedDict
 
+import orjson
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from langchain_community.tools import DuckDuckGoSearchRun
@@ -17,7 +19,10 @@ from pydantic import BaseModel
 from interaction_agent import TriageAgent
 from query_service import QueryService
 from session_manager import session_manager
+from logging_config import setup_logging
+from web_search_agent import WebSearchAgent
 
+logger = logging.getLogger(__name__)
 
 # Pydantic models for API
 class ChatRequest(BaseModel):
@@ -69,21 +74,22 @@ class WebSocketManager:
     async def connect(self, websocket: WebSocket, session_id: str):
         await websocket.accept()
         self.connections[session_id] = websocket
-        print(f"WebSocket connected for session: {session_id}")
+        logger.info("WebSocket connected for session: %s", session_id)
 
     def disconnect(self, session_id: str):
         if session_id in self.connections:
             del self.connections[session_id]
-            print(f"WebSocket disconnected for session: {session_id}")
+            logger.info("WebSocket disconnected for session: %s", session_id)
 
     async def send_message(self, session_id: str, message: str, message_type: str = "update"):
         if session_id in self.connections:
             try:
                 response = {"type": message_type, "content": message, "timestamp": datetime.now().isoformat()}
-                await self.connections[session_id].send_text(json.dumps(response))
-                print(f"Sent WebSocket message to {session_id}: {message[:100]}...")
-            except Exception as e:
-                print(f"Error sending WebSocket message: {e}")
+                await self.connections[session_id].send_text(orjson.dumps(response).decode())
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Sent WebSocket message to %s: %s...", session_id, message[:100])
+            except Exception:
+                logger.exception("Error sending WebSocket message to %s", session_id)
                 self.disconnect(session_id)
 
     async def send_message_with_context(
@@ -97,16 +103,19 @@ class WebSocketManager:
                     "timestamp": datetime.now().isoformat(),
                     "context": context or {},
                 }
-                await self.connections[session_id].send_text(json.dumps(response))
-                print(f"Sent WebSocket message with context to {session_id}: {message[:100]}...")
-            except Exception as e:
-                print(f"Error sending WebSocket message: {e}")
+                await self.connections[session_id].send_text(orjson.dumps(response).decode())
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Sent WebSocket message with context to %s: %s...", session_id, message[:100])
+            except Exception:
+                logger.exception("Error sending WebSocket message to %s", session_id)
                 self.disconnect(session_id)
 
 
 # Initialize components
 websocket_manager = WebSocketManager()
 llm = ChatOpenAI(model="gpt-4.1", temperature=0.7)
+# Lower-temperature model shared by the analysis and summarization agents
+analysis_llm = ChatOpenAI(model="gpt-4", temperature=0.3)
 search_tool = DuckDuckGoSearchRun()
 
 # Store active workflows for updates
@@ -118,8 +127,8 @@ pending_confirmations: Dict[str, dict] = {}
 
 # Agent implementations
 class RequirementAnalyzer:
-    def __init__(self):
-        self.llm = ChatOpenAI(model="gpt-4", temperature=0.3)
+    def __init__(self, llm: Optional[ChatOpenAI] = None):
+        self.llm = llm or ChatOpenAI(model="gpt-4", temperature=0.3)
 
     async def analyze_update(self, original_request: str, new_request: str, requirements_history: List[str]) -> dict:
         """Analyze if the new request requires re-running the workflow"""
@@ -163,10 +172,10 @@ class RequirementAnalyzer:
         try:
             response = await self.llm.ainvoke([HumanMessage(content=prompt)])
             # Parse JSON response
-            result = json.loads(response.content)
+            result = orjson.loads(response.content)
             return result
         except Exception as e:
-            print(f"Error analyzing requirements: {e}")
+            logger.exception("Error analyzing requirements")
             # Default to re-running everything on error
             return {
                 "needs_exercise_research": True,
@@ -178,25 +187,9 @@ class RequirementAnalyzer:
             }
 
 
-class WebSearchAgent:
-    def __init__(self, agent_type: str):
-        self.agent_type = agent_type
-        self.search_tool = DuckDuckGoSearchRun()
-
-    async def search(self, query: str) -> str:
-        """Perform web search and return results"""
-        try:
-            print(f"{self.agent_type} searching for: {query}")
-            results = self.search_tool.run(query)
-            return results
-        except Exception as e:
-            print(f"Search error in {self.agent_type}: {e}")
-            return f"Search failed: {str(e)}"
-
-
 class SummarizerAgent:
-    def __init__(self):
-        self.llm = ChatOpenAI(model="gpt-4", temperature=0.3)
+    def __init__(self, llm: Optional[ChatOpenAI] = None):
+        self.llm = llm or ChatOpenAI(model="gpt-4", temperature=0.3)
 
     async def summarize(
         self, exercise_data: str, schedule_data: str, user_request: str, is_update: bool = False
@@ -232,7 +225,7 @@ class SummarizerAgent:
             response = await self.llm.ainvoke([HumanMessage(content=prompt)])
             return response.content
         except Exception as e:
-            print(f"Summarization error: {e}")
+            logger.exception("Summarization error")
             return f"Failed to create plan: {str(e)}"
 
 
@@ -243,6 +236,11 @@ class TriageService:
         self.triage_agent = triage_agent
         self.websocket_manager = websocket_manager
         self.query_service = query_service
+        # Handlers per triage action; any other action is processed directly
+        self._action_handlers = {
+            "confirm": self._request_confirmation,
+            "reject": self._redirect,
+        }
     
     async def process_message(self, session_id: str, message: str, is_update: bool) -> dict:
         """
@@ -315,56 +313,57 @@ class TriageService:
     async def _handle_new_message(self, session_id: str, message: str) -> dict:
         """Handle new messages through triage classification"""
         triage_result = await self.triage_agent.classify_and_route(message)
+        handler = self._action_handlers.get(triage_result["action"], self._process_directly)
+        return await handler(session_id, message, triage_result)
+    
+    async def _request_confirmation(self, session_id: str, message: str, triage_result: dict) -> dict:
+        """High-confidence create request - ask the user to confirm"""
+        await self.websocket_manager.send_message(
+            session_id,
+            triage_result["confirmation_message"],
+            "triage_confirmation"
+        )
         
-        if triage_result["action"] == "confirm":
-            # High-confidence create request - send confirmation
-            await self.websocket_manager.send_message(
-                session_id,
-                triage_result["confirmation_message"],
-                "triage_confirmation"
-            )
-            
-            # Store pending confirmation
-            pending_confirmations[session_id] = {
-                "original_message": message,
-                "triage_result": triage_result,
-                "timestamp": datetime.now()
-            }
-            
-            return {
-                "action": "awaiting_confirmation",
-                "message": triage_result["confirmation_message"],
-                "session_id": session_id,
-                "status": "awaiting_confirmation"
-            }
-            
-        elif triage_result["action"] == "reject":
-            # Non-exercise planning - send redirect
-            await self.websocket_manager.send_message(
-                session_id,
-                triage_result["redirect_message"],
-                "triage_redirect"
-            )
-            
-            return {
-                "action": "redirected",
-                "message": triage_result["redirect_message"],
-                "session_id": session_id,
-                "status": "redirected"
-            }
-            
-        else:
-            # Direct processing (action == "direct_process")
-            if triage_result["intent_type"] == "Query":
-                return await self._handle_query(session_id, message, triage_result)
-            else:
-                return {
-                    "action": "start_workflow",
-                    "original_message": message,
-                    "message": "I'm working on your exercise plan. You'll receive updates via WebSocket.",
-                    "session_id": session_id,
-                    "status": "processing"
-                }
+        # Store pending confirmation
+        pending_confirmations[session_id] = {
+            "original_message": message,
+            "triage_result": triage_result,
+            "timestamp": datetime.now()
+        }
+        
+        return {
+            "action": "awaiting_confirmation",
+            "message": triage_result["confirmation_message"],
+            "session_id": session_id,
+            "status": "awaiting_confirmation"
+        }
+    
+    async def _redirect(self, session_id: str, message: str, triage_result: dict) -> dict:
+        """Non-exercise planning - send redirect"""
+        await self.websocket_manager.send_message(
+            session_id,
+            triage_result["redirect_message"],
+            "triage_redirect"
+        )
+        
+        return {
+            "action": "redirected",
+            "message": triage_result["redirect_message"],
+            "session_id": session_id,
+            "status": "redirected"
+        }
+    
+    async def _process_directly(self, session_id: str, message: str, triage_result: dict) -> dict:
+        """Direct processing (action == "direct_process"): answer queries or start a workflow"""
+        if triage_result["intent_type"] == "Query":
+            return await self._handle_query(session_id, message, triage_result)
+        return {
+            "action": "start_workflow",
+            "original_message": message,
+            "message": "I'm working on your exercise plan. You'll receive updates via WebSocket.",
+            "session_id": session_id,
+            "status": "processing"
+        }
     
     async def _handle_query(self, session_id: str, message: str, triage_result: dict) -> dict:
         """Handle direct query answering with workout context"""
@@ -387,8 +386,8 @@ class TriageService:
                 "confidence": query_result.get("confidence", 0.0)
             }
             
-        except Exception as e:
-            print(f"Error handling query for session {session_id}: {e}")
+        except Exception:
+            logger.exception("Error handling query for session %s", session_id)
             error_message = "I'm sorry, I encountered an error while answering your question. Could you please try asking again?"
             
             await self.websocket_manager.send_message(
@@ -435,10 +434,10 @@ class TriageService:
 
 
 # Initialize agents
-requirement_analyzer = RequirementAnalyzer()
-exercise_search_agent = WebSearchAgent("Exercise Search Agent")
-schedule_search_agent = WebSearchAgent("Schedule Search Agent")
-summarizer_agent = SummarizerAgent()
+requirement_analyzer = RequirementAnalyzer(llm=analysis_llm)
+exercise_search_agent = WebSearchAgent("Exercise Search Agent", search_tool=search_tool)
+schedule_search_agent = WebSearchAgent("Schedule Search Agent", search_tool=search_tool)
+summarizer_agent = SummarizerAgent(llm=analysis_llm)
 triage_agent = TriageAgent()
 query_service = QueryService(active_workflows=active_workflows)
 triage_service = TriageService(triage_agent, websocket_manager, query_service)
@@ -451,7 +450,7 @@ async def requirement_evaluation_node(state: AgentState) -> AgentState:
 
     # Check if this is an update
     if len(state["requirements_history"]) > 1:
-        print(f"Evaluating requirement update for session {session_id}")
+        logger.info("Evaluating requirement update for session %s", session_id)
 
         original_request = state["original_request"]
         current_request = state["user_request"]
@@ -480,11 +479,11 @@ async def requirement_evaluation_node(state: AgentState) -> AgentState:
             # Reset results that need to be regenerated
             if analysis["needs_exercise_research"] or analysis["needs_schedule_research"]:
                 state["exercise_results"] = None
-                print("Resetting exercise results for re-search")
+                logger.info("Resetting exercise results for re-search")
 
             if analysis["needs_new_plan"]:
                 state["final_plan"] = None
-                print("Resetting final plan for regeneration")
+                logger.info("Resetting final plan for regeneration")
 
             state["workflow_status"] = WorkflowStatus.RE_EVALUATING.value
             state["needs_rerun"] = True
@@ -512,7 +511,7 @@ async def planning_node(state: AgentState) -> AgentState:
 
     await websocket_manager.send_message(session_id, message, "planning_start")
 
-    print(f"Planning Agent processing request: {user_request} (Status: {status})")
+    logger.info("Planning Agent processing request: %s (Status: %s)", user_request, status)
 
     # Add planning message to state
     planning_message = AIMessage(content=f"Planning your exercise routine... (Status: {status})")
@@ -526,7 +525,7 @@ async def exercise_search_node(state: AgentState) -> AgentState:
     """Web Search Agent - searches for exercises and training schedules"""
     # Skip if we already have results and don't need to re-run
     if state.get("exercise_results") and not state.get("needs_rerun"):
-        print("Skipping exercise search - already have results")
+        logger.info("Skipping exercise search - already have results")
         return state
 
     user_request = state["user_request"]
@@ -534,7 +533,7 @@ async def exercise_search_node(state: AgentState) -> AgentState:
     # Combined search query for exercises and scheduling
     search_query = f"exercises training schedule workout plan for building wider back lats deltoids upper body width muscle hypertrophy {user_request}"
 
-    print("Starting exercise and schedule search...")
+    logger.info("Starting exercise and schedule search...")
     state["workflow_status"] = WorkflowStatus.SEARCHING.value
 
     exercise_results = await exercise_search_agent.search(search_query)
@@ -554,9 +553,10 @@ async def summarization_node(state: AgentState) -> AgentState:
     """Summarizer Agent - creates final plan"""
     exercise_data = state.get("exercise_results", "")
     user_request = state["user_request"]
-    is_update = len(state["requirements_history"]) > 1
+    requirements_history = state["requirements_history"]
+    is_update = len(requirements_history) > 1
 
-    print("Starting plan summarization...")
+    logger.info("Starting plan summarization...")
     state["workflow_status"] = WorkflowStatus.SUMMARIZING.value
 
     # Use exercise_data for both exercises and scheduling since we combined the search
@@ -570,28 +570,24 @@ async def summarization_node(state: AgentState) -> AgentState:
     plan_type = "updated plan" if is_update else "plan"
     final_message = f"Here is your {plan_type}:\n\n{final_plan}"
 
-    # Create requirement context with correct numbering
-    current_req = state["user_request"]
-    req_position = 0
-
-    # Find which requirement this plan actually addresses
-    for i, req in enumerate(state["requirements_history"]):
-        if req == current_req:
-            req_position = i
-            break
+    # Find which requirement this plan actually addresses (single scan of the history)
+    try:
+        req_position = requirements_history.index(user_request)
+    except ValueError:
+        req_position = 0
 
     # Get previous requirement (if exists)
     previous_req = None
     if req_position > 0:
-        previous_req = state["requirements_history"][req_position - 1]
+        previous_req = requirements_history[req_position - 1]
 
     requirement_context = {
         "requirement_number": req_position + 1,
-        "requirement_text": current_req,
+        "requirement_text": user_request,
         "previous_request": previous_req,
         "original_request": state["original_request"],
         "is_update": is_update,
-        "total_requirements": len(state["requirements_history"]),
+        "total_requirements": len(requirements_history),
     }
 
     await websocket_manager.send_message_with_context(
@@ -663,8 +659,17 @@ def create_workflow():
 # Initialize the workflow
 workflow_app = create_workflow()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the session cleanup loop for the lifetime of the server"""
+    session_manager.start_cleanup()
+    yield
+    await session_manager.shutdown()
+
+
 # FastAPI application
-app = FastAPI(title="Dynamic Exercise Planning Multi-Agent System")
+app = FastAPI(title="Dynamic Exercise Planning Multi-Agent System", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -683,7 +688,9 @@ async def chat_endpoint(request: ChatRequest):
     user_message = request.message
     is_update = request.is_update
 
-    print(f"Received {'update' if is_update else 'new'} request for session {session_id}: {user_message}")
+    logger.info("Received %s request for session %s", "update" if is_update else "new", session_id)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("User message: %s...", user_message[:100])
 
     # Ensure session exists in session_manager
     session_manager.create_session(session_id)
@@ -727,21 +734,21 @@ async def start_workflow(session_id: str, user_message: str):
 async def process_request_async(session_id: str, initial_state: AgentState, config: dict):
     """Process the request asynchronously using the workflow"""
     try:
-        print(f"Starting async processing for session {session_id}")
+        logger.info("Starting async processing for session %s", session_id)
 
         # Run the workflow
         async for event in workflow_app.astream(initial_state, config=config):
-            print(f"Workflow event: {list(event.keys())}")
+            logger.debug("Workflow event: %s", list(event))
 
             # Update stored state
             if session_id in active_workflows:
                 for node_name, node_state in event.items():
                     active_workflows[session_id]["last_state"] = node_state
 
-        print(f"Workflow completed for session {session_id}")
+        logger.info("Workflow completed for session %s", session_id)
 
     except Exception as e:
-        print(f"Error in async processing for session {session_id}: {e}")
+        logger.exception("Error in async processing for session %s", session_id)
         if websocket_manager:
             await websocket_manager.send_message(
                 session_id, f"Sorry, there was an error creating your plan: {str(e)}", "error"
@@ -751,21 +758,21 @@ async def process_request_async(session_id: str, initial_state: AgentState, conf
 async def process_update_async(session_id: str, updated_state: AgentState, config: dict):
     """Process requirement updates asynchronously"""
     try:
-        print(f"Processing requirement update for session {session_id}")
+        logger.info("Processing requirement update for session %s", session_id)
 
         # Continue the workflow from where it left off
         async for event in workflow_app.astream(updated_state, config=config):
-            print(f"Update workflow event: {list(event.keys())}")
+            logger.debug("Update workflow event: %s", list(event))
 
             # Update stored state
             if session_id in active_workflows:
                 for node_name, node_state in event.items():
                     active_workflows[session_id]["last_state"] = node_state
 
-        print(f"Update workflow completed for session {session_id}")
+        logger.info("Update workflow completed for session %s", session_id)
 
     except Exception as e:
-        print(f"Error processing update for session {session_id}: {e}")
+        logger.exception("Error processing update for session %s", session_id)
         if websocket_manager:
             await websocket_manager.send_message(
                 session_id, f"Sorry, there was an error processing your update: {str(e)}", "error"
@@ -781,24 +788,24 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
         while True:
             # Keep connection alive and handle any incoming messages
             data = await websocket.receive_text()
-            print(f"Received WebSocket message from {session_id}: {data}")
+            logger.debug("Received WebSocket message from %s: %s", session_id, data)
 
             # You could handle WebSocket-based updates here too
             try:
-                message_data = json.loads(data)
+                message_data = orjson.loads(data)
                 if message_data.get("type") == "update_requirements":
                     # Handle requirement updates via WebSocket
                     new_requirements = message_data.get("message")
                     if new_requirements:
                         # Trigger update via the same mechanism as HTTP
                         await handle_websocket_update(session_id, new_requirements)
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 # Not JSON, ignore or handle as plain text
                 pass
 
     except WebSocketDisconnect:
         websocket_manager.disconnect(session_id)
-        print(f"WebSocket disconnected: {session_id}")
+        logger.info("WebSocket disconnected: %s", session_id)
 
 
 async def handle_websocket_update(session_id: str, new_requirements: str):
@@ -862,6 +869,8 @@ async def get_session_requirements(session_id: str):
 if __name__ == "__main__":
     import uvicorn
 
+    setup_logging(log_level="INFO")
+
     print("Starting Dynamic Exercise Planning Multi-Agent System...")
     print("HTTP API available at: http://localhost:8000")
     print("WebSocket endpoint: ws://localhost:8000/ws/{session_id}")
@@ -5,34 +5,86 @@ Provides an interactive command-line interface to chat with the multi-agent syst
 """
 
 import asyncio
-import json
+import os
 import uuid
 import sys
 from datetime import datetime
+from pathlib import Path
 from typing import Optional
 
 import aiohttp
+import orjson
 import websockets
 
 
+# Display icon for each progress message type sent by the backend
+MESSAGE_TYPE_ICONS = {
+    "planning_start": "🔄",
+    "requirement_analysis": "🔍",
+    "status_update": "📊",
+    "search_update": "🔍",
+}
+
+# Where the last session id is kept so a restarted CLI resumes the same backend session
+SESSION_FILE = Path.home() / ".multi_agent_chat" / "session.json"
+
+
+def load_session_id() -> Optional[str]:
+    """Return the saved session id, if any"""
+    try:
+        return orjson.loads(SESSION_FILE.read_bytes()).get("session_id")
+    except (OSError, orjson.JSONDecodeError, AttributeError):
+        return None
+
+
+def save_session_id(session_id: str):
+    """Save the session id for the next CLI start (best effort, owner-only file)"""
+    try:
+        SESSION_FILE.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        # Create the file owner-only up front so it is never readable by others
+        fd = os.open(SESSION_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(orjson.dumps({"session_id": session_id}))
+    except OSError:
+        pass
+
+
 class ChatCLI:
     def __init__(self, base_url="http://localhost:8000", ws_url="ws://localhost:8000"):
         self.base_url = base_url
         self.ws_url = ws_url
-        self.session_id = str(uuid.uuid4())
+        self.session_id = load_session_id() or str(uuid.uuid4())
         self.websocket = None
         self.is_first_message = True
         self.processing = False
         self.shutdown_event = asyncio.Event()
+        self.http_session: Optional[aiohttp.ClientSession] = None
+        # Slash-command handlers, looked up by exact command text
+        self.commands = {
+            "/new": self.start_new_session,
+            "/status": self.show_status,
+            "/history": self.show_history,
+        }
+    
+    def _get_http_session(self) -> aiohttp.ClientSession:
+        """Return the shared HTTP session, creating it on first use"""
+        if self.http_session is None or self.http_session.closed:
+            self.http_session = aiohttp.ClientSession()
+        return self.http_session
+    
+    async def close_http_session(self):
+        """Close the shared HTTP session if it was opened"""
+        if self.http_session is not None and not self.http_session.closed:
+            await self.http_session.close()
         
     async def check_server_health(self):
         """Check if the server is running"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"{self.base_url}/health") as response:
-                    if response.status == 200:
-                        return True
-                    return False
+            session = self._get_http_session()
+            async with session.get(f"{self.base_url}/health") as response:
+                if response.status == 200:
+                    return True
+                return False
         except:
             return False
     
@@ -49,21 +101,21 @@ class ChatCLI:
     async def send_message(self, message: str):
         """Send message to the backend"""
         try:
-            async with aiohttp.ClientSession() as session:
-                data = {
-                    "message": message,
-                    "session_id": self.session_id,
-                    "is_update": not self.is_first_message
-                }
+            session = self._get_http_session()
+            data = {
+                "message": message,
+                "session_id": self.session_id,
+                "is_update": not self.is_first_message
+            }
                 
-                async with session.post(f"{self.base_url}/chat", json=data) as response:
-                    if response.status == 200:
-                        self.is_first_message = False
-                        self.processing = True
-                        return await response.json()
-                    else:
-                        print(f"❌ Server error: {response.status}")
-                        return None
+            async with session.post(f"{self.base_url}/chat", json=data) as response:
+                if response.status == 200:
+                    self.is_first_message = False
+                    self.processing = True
+                    return await response.json(loads=orjson.loads)
+                else:
+                    print(f"❌ Server error: {response.status}")
+                    return None
         except Exception as e:
             print(f"❌ Failed to send message: {e}")
             return None
@@ -76,9 +128,9 @@ class ChatCLI:
         try:
             async for message in self.websocket:
                 try:
-                    data = json.loads(message)
+                    data = orjson.loads(message)
                     await self.handle_websocket_message(data)
-                except json.JSONDecodeError:
+                except orjson.JSONDecodeError:
                     print(f"📨 {message}")
                 except Exception as e:
                     print(f"❌ Error handling message: {e}")
@@ -107,19 +159,7 @@ class ChatCLI:
             time_str = f"[{datetime.now().strftime('%H:%M:%S')}] "
         
         # Map message types to user-friendly displays
-        if message_type == "planning_start":
-            print(f"{time_str}🔄 {content}")
-            
-        elif message_type == "requirement_analysis":
-            print(f"{time_str}🔍 {content}")
-            
-        elif message_type == "status_update":
-            print(f"{time_str}📊 {content}")
-            
-        elif message_type == "search_update":
-            print(f"{time_str}🔍 {content}")
-            
-        elif message_type == "final_plan":
+        if message_type == "final_plan":
             print(f"\n{time_str}✅ {content}")
             
             # Show requirement context if available
@@ -141,28 +181,28 @@ class ChatCLI:
             self.processing = False
             
         else:
-            # Fallback for unknown message types
-            print(f"{time_str}📨 {content}")
+            # Progress updates get a per-type icon; unknown types fall back to a generic one
+            print(f"{time_str}{MESSAGE_TYPE_ICONS.get(message_type, '📨')} {content}")
     
     async def get_session_status(self):
         """Get current session status"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"{self.base_url}/sessions/{self.session_id}/status") as response:
-                    if response.status == 200:
-                        return await response.json()
-                    return None
+            session = self._get_http_session()
+            async with session.get(f"{self.base_url}/sessions/{self.session_id}/status") as response:
+                if response.status == 200:
+                    return await response.json(loads=orjson.loads)
+                return None
         except:
             return None
     
     async def get_requirements_history(self):
         """Get requirements history"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"{self.base_url}/sessions/{self.session_id}/requirements") as response:
-                    if response.status == 200:
-                        return await response.json()
-                    return None
+            session = self._get_http_session()
+            async with session.get(f"{self.base_url}/sessions/{self.session_id}/requirements") as response:
+                if response.status == 200:
+                    return await response.json(loads=orjson.loads)
+                return None
         except:
             return None
     
@@ -189,69 +229,75 @@ class ChatCLI:
     
     async def handle_command(self, command: str):
         """Handle special commands"""
-        if command == "/new":
-            # Start new session
-            self.session_id = str(uuid.uuid4())
-            self.is_first_message = True
-            self.processing = False
-            
-            # Reconnect WebSocket
-            if self.websocket:
-                await self.websocket.close()
-            
-            if await self.connect_websocket():
-                print(f"🆕 New session started: {self.session_id[:8]}...")
-                # Restart WebSocket listener if needed
-                pass  # Will be handled by main loop
-            else:
-                print("❌ Failed to start new session")
-                
-        elif command == "/status":
-            if self.is_first_message:
-                print("📊 Session Status: No active session")
-                print("   💡 Send a message first to create a session")
-            else:
-                status = await self.get_session_status()
-                if status and status.get('status') != 'not_found':
-                    print(f"📊 Session Status:")
-                    print(f"   Status: {status.get('status', 'unknown')}")
-                    print(f"   Processing: {status.get('processing', False)}")
-                    print(f"   Requirements: {status.get('requirements_count', 0)}")
-                    print(f"   Has Plan: {status.get('has_final_plan', False)}")
-                else:
-                    print("📊 Session Status: Session not found or expired")
-                    print("   💡 Send a message to create a new session")
-                
-        elif command == "/history":
-            if self.is_first_message:
-                print("📝 Requirements History: No active session")
-                print("   💡 Send a message first to create a session")
-            else:
-                history = await self.get_requirements_history()
-                if history:
-                    print(f"📝 Requirements History:")
-                    print(f"   Original: {history.get('original_request', 'None')}")
-                    print(f"   Current: {history.get('current_request', 'None')}")
-                    reqs = history.get('requirements_history', [])
-                    if reqs:
-                        print(f"   All updates:")
-                        for i, req in enumerate(reqs, 1):
-                            print(f"     {i}. {req}")
-                    else:
-                        print("   No requirements yet")
-                else:
-                    print("📝 Requirements History: Session not found or expired")
-                    print("   💡 Send a message to create a new session")
-                
-        elif command == "/quit":
+        if command == "/quit":
             return True
-            
+        
+        handler = self.commands.get(command)
+        if handler:
+            await handler()
         else:
             print(f"❌ Unknown command: {command}")
             print("Available: /new, /status, /history, /quit")
             
         return False
     
+    async def start_new_session(self):
+        """Start a new session and reconnect the WebSocket"""
+        self.session_id = str(uuid.uuid4())
+        save_session_id(self.session_id)
+        self.is_first_message = True
+        self.processing = False
+
+        # Reconnect WebSocket
+        if self.websocket:
+            await self.websocket.close()
+
+        if await self.connect_websocket():
+            print(f"🆕 New session started: {self.session_id[:8]}...")
+            # Restart WebSocket listener if needed
+            pass  # Will be handled by main loop
+        else:
+            print("❌ Failed to start new session")
+    
+    async def show_status(self):
+        """Print the current session status"""
+        if self.is_first_message:
+            print("📊 Session Status: No active session")
+            print("   💡 Send a message first to create a session")
+        else:
+            status = await self.get_session_status()
+            if status and status.get('status') != 'not_found':
+                print(f"📊 Session Status:")
+                print(f"   Status: {status.get('status', 'unknown')}")
+                print(f"   Processing: {status.get('processing', False)}")
+                print(f"   Requirements: {status.get('requirements_count', 0)}")
+                print(f"   Has Plan: {status.get('has_final_plan', False)}")
+            else:
+                print("📊 Session Status: Session not found or expired")
+                print("   💡 Send a message to create a new session")
+    
+    async def show_history(self):
+        """Print the requirements history"""
+        if self.is_first_message:
+            print("📝 Requirements History: No active session")
+            print("   💡 Send a message first to create a session")
+        else:
+            history = await self.get_requirements_history()
+            if history:
+                print(f"📝 Requirements History:")
+                print(f"   Original: {history.get('original_request', 'None')}")
+                print(f"   Current: {history.get('current_request', 'None')}")
+                reqs = history.get('requirements_history', [])
+                if reqs:
+                    print(f"   All updates:")
+                    for i, req in enumerate(reqs, 1):
+                        print(f"     {i}. {req}")
+                else:
+                    print("   No requirements yet")
+            else:
+                print("📝 Requirements History: Session not found or expired")
+                print("   💡 Send a message to create a new session")
+    
     async def get_user_input(self):
         """Get user input using asyncio to_thread for non-blocking input"""
         while not self.shutdown_event.is_set():
@@ -300,11 +346,22 @@ class ChatCLI:
             print("❌ Server is not running!")
             print("Please start the server first:")
             print("   python backend.py")
+            await self.close_http_session()
             return
         
-        # Connect WebSocket
-        if not await self.connect_websocket():
+        # Look up the saved session and open the WebSocket concurrently;
+        # neither round-trip depends on the other
+        status, connected = await asyncio.gather(self.get_session_status(), self.connect_websocket())
+        
+        # Resume the saved session if the backend still has it
+        if status and status.get("status") != "not_found":
+            self.is_first_message = False
+            print(f"🔁 Resumed session: {self.session_id[:8]}...")
+        save_session_id(self.session_id)
+        
+        if not connected:
             print("❌ Failed to connect. Exiting.")
+            await self.close_http_session()
             return
         
         # Print welcome
@@ -338,6 +395,7 @@ class ChatCLI:
             self.shutdown_event.set()
             if self.websocket:
                 await self.websocket.close()
+            await self.close_http_session()
 
 
 async def main():
@@ -1,10 +1,10 @@
 import asyncio
-import json
 import uuid
 from datetime import datetime
 from typing import Optional
 
 import aiohttp
+import orjson
 import websockets
 
 
@@ -71,7 +71,7 @@ class DynamicExercisePlanningClient:
             async for message in self.websocket:
                 try:
                     # Parse JSON message
-                    data = json.loads(message)
+                    data = orjson.loads(message)
                     message_type = data.get("type", "unknown")
                     content = data.get("content", message)
                     timestamp = data.get("timestamp", datetime.now().isoformat())
@@ -121,7 +121,7 @@ class DynamicExercisePlanningClient:
                         # Don't break immediately - wait for potential additional updates
                         continue
 
-                except json.JSONDecodeError:
+                except orjson.JSONDecodeError:
                     # Handle non-JSON messages
                     timestamp = datetime.now().strftime("%H:%M:%S")
                     print(f"\n📨 [{timestamp}] MESSAGE:")
@@ -151,7 +151,7 @@ class DynamicExercisePlanningClient:
 
         try:
             update_data = {"type": "update_requirements", "message": update_message}
-            await self.websocket.send(json.dumps(update_data))
+            await self.websocket.send(orjson.dumps(update_data).decode())
             print(f"📤 Update sent via WebSocket: {update_message[:100]}...")
             return True
         except Exception as e:
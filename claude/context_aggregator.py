@@ -12,6 +12,11 @@ from typing import Any, Callable, Dict, List, Optional
 
 from claude.session_manager import ChatSession
 
+# Keys kept when a large context dict is summarized
+SUMMARY_KEYS = frozenset({"intent", "status", "progress", "current_step", "summary", "error"})
+# Keys the finance formatter renders itself rather than as generic fields
+FINANCE_FORMATTED_KEYS = frozenset({"intent", "entities", "state"})
+
 
 class ContextAggregator:
     """Aggregates context from multiple domain workflows for LLM queries."""
@@ -25,6 +30,10 @@ class ContextAggregator:
         """
         self.max_context_size = max_context_size
         self.domain_extractors: Dict[str, Callable] = {}
+        self.domain_formatters: Dict[str, Callable] = {
+            "finance": self._format_finance_context,
+            "hr": self._format_hr_context,
+        }
 
     def register_domain_extractor(self, domain: str, extractor: Callable) -> None:
         """
@@ -68,54 +77,44 @@ class ContextAggregator:
             "formatted_context": "",
         }
 
-        # Build formatted context string
-        context_lines = []
+        # Membership set for the domain filter (an empty or missing filter includes everything)
+        wanted_domains = set(filter_domains) if filter_domains else None
+
+        # Build one section of lines per domain; approvals are appended to their
+        # domain's section so the whole context is joined in a single pass
+        domain_sections: Dict[str, List[str]] = {}
 
         for domain, workflow in session.workflows.items():
-            if filter_domains and domain not in filter_domains:
+            if wanted_domains is not None and domain not in wanted_domains:
                 continue
 
             # Add domain header
-            context_lines.append(f"Domain: {domain}")
+            section = domain_sections[domain] = [f"Domain: {domain}"]
 
             # Build workflow context with string formatting
             workflow_context = self._build_workflow_context(workflow, summarize)
-            context_lines.append(f"  Workflow: {workflow.description}")
-            context_lines.append(f"  Status: {workflow_context['status']}")
+            section.append(f"  Workflow: {workflow.description}")
+            section.append(f"  Status: {workflow_context['status']}")
             if workflow_context.get("progress", 0) > 0:
-                context_lines.append(f"  Progress: {workflow_context['progress']:.1%}")
-            context_lines.append(f"  Context: {workflow_context['context']}")
+                section.append(f"  Progress: {workflow_context['progress']:.1%}")
+            section.append(f"  Context: {workflow_context['context']}")
 
             if workflow_context.get("custom_context"):
-                context_lines.append(f"  Custom Context: {workflow_context['custom_context']}")
-
-            context_lines.append("")  # Empty line between domains
+                section.append(f"  Custom Context: {workflow_context['custom_context']}")
 
-        # Add pending approvals
+        # Add pending approvals to the domain section if it exists, or create new section
         for domain, approval in session.pending_approvals.items():
-            if filter_domains and domain not in filter_domains:
+            if wanted_domains is not None and domain not in wanted_domains:
                 continue
 
-            # Add approval to the domain section if it exists, or create new section
-            domain_found = False
-            for i, line in enumerate(context_lines):
-                if line == f"Domain: {domain}":
-                    domain_found = True
-                    # Find where to insert approval (after domain workflows)
-                    insert_idx = i + 1
-                    while insert_idx < len(context_lines) and context_lines[insert_idx].startswith("  "):
-                        insert_idx += 1
-                    context_lines.insert(insert_idx, f"  Pending Approval: {approval.description}")
-                    context_lines.insert(
-                        insert_idx + 1, f"  Approval Details: {self._format_approval_details(approval.triage_result)}"
-                    )
-                    break
-
-            if not domain_found:
-                context_lines.append(f"Domain: {domain}")
-                context_lines.append(f"  Pending Approval: {approval.description}")
-                context_lines.append(f"  Approval Details: {self._format_approval_details(approval.triage_result)}")
-                context_lines.append("")  # Empty line
+            section = domain_sections.setdefault(domain, [f"Domain: {domain}"])
+            section.append(f"  Pending Approval: {approval.description}")
+            section.append(f"  Approval Details: {self._format_approval_details(approval.triage_result)}")
+
+        context_lines = []
+        for section in domain_sections.values():
+            context_lines.extend(section)
+            context_lines.append("")  # Empty line between domains
 
         # Workflows are now handled in the main loop above since both active and completed
         # workflows are stored in the same 'workflows' dict, differentiated by status
@@ -181,20 +180,15 @@ class ContextAggregator:
         if not context_dict:
             return "No context available"
 
-        # Check if we have a domain-specific formatter
-        formatter_method = f"_format_{domain}_context"
-        if hasattr(self, formatter_method):
-            return getattr(self, formatter_method)(context_dict, summarize)
-
-        # Default formatting
-        return self._format_default_context(context_dict, summarize)
+        # Use the domain-specific formatter if one exists, default formatting otherwise
+        formatter = self.domain_formatters.get(domain, self._format_default_context)
+        return formatter(context_dict, summarize)
 
     def _format_default_context(self, context_dict: Dict[str, Any], summarize: bool) -> str:
         """Default context formatting - simple key-value pairs."""
         if summarize and len(json.dumps(context_dict)) > 1000:
             # Extract key information for summary
-            summary_keys = ["intent", "status", "progress", "current_step", "summary", "error"]
-            filtered_dict = {k: v for k, v in context_dict.items() if k in summary_keys}
+            filtered_dict = {k: v for k, v in context_dict.items() if k in SUMMARY_KEYS}
 
             # Check for summary in state subdict too
             if "state" in context_dict and isinstance(context_dict["state"], dict):
@@ -254,7 +248,7 @@ class ContextAggregator:
                 lines.append(f"Risk Level: {state['risk_level']}")
 
         # Add other fields
-        remaining_fields = {k: v for k, v in context_dict.items() if k not in ["intent", "entities", "state"]}
+        remaining_fields = {k: v for k, v in context_dict.items() if k not in FINANCE_FORMATTED_KEYS}
         for key, value in remaining_fields.items():
             lines.append(f"{key.title()}: {value}")
 
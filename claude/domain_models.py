@@ -23,6 +23,10 @@ class WorkflowStatus(Enum):
     CANCELLED = "cancelled"
 
 
+# Statuses for which a workflow still counts as in progress
+ACTIVE_WORKFLOW_STATUSES = frozenset({WorkflowStatus.PENDING, WorkflowStatus.RUNNING, WorkflowStatus.PAUSED})
+
+
 class ApprovalStatus(Enum):
     """Approval request states"""
 
@@ -61,7 +65,7 @@ class RunningWorkflow:
 
     def __post_init__(self):
         if not self.id:
-            self.id = str(uuid.uuid4())
+            self.id = uuid.uuid4().hex
         # Set initial status without triggering update
         self._status = WorkflowStatus.PENDING
 
@@ -100,7 +104,7 @@ class RunningWorkflow:
 
     def is_active(self) -> bool:
         """Check if workflow is actively running"""
-        return self.status in [WorkflowStatus.PENDING, WorkflowStatus.RUNNING, WorkflowStatus.PAUSED]
+        return self.status in ACTIVE_WORKFLOW_STATUSES
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for serialization"""
@@ -138,11 +142,11 @@ class PendingApproval:
 
     def __post_init__(self):
         if not self.id:
-            self.id = str(uuid.uuid4())
+            self.id = uuid.uuid4().hex
 
-    def is_expired(self) -> bool:
-        """Check if approval request has expired"""
-        return datetime.now() > self.expires_at
+    def is_expired(self, now: Optional[datetime] = None) -> bool:
+        """Check if approval request has expired (as of ``now``, default current time)"""
+        return (now or datetime.now()) > self.expires_at
 
     def approve(self):
         """Mark approval as approved"""
@@ -156,9 +160,9 @@ class PendingApproval:
         """Mark approval as expired"""
         self.status = ApprovalStatus.EXPIRED
 
-    def is_pending(self) -> bool:
+    def is_pending(self, now: Optional[datetime] = None) -> bool:
         """Check if approval is still pending and not expired"""
-        return self.status == ApprovalStatus.PENDING and not self.is_expired()
+        return self.status == ApprovalStatus.PENDING and not self.is_expired(now)
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for serialization"""
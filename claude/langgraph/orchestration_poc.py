@@ -230,29 +230,35 @@ class WorkflowStateReader:
         contexts = {}
         
         # Find all running workflows for this session
+        targets = []
         for thread_id, task in self.running_workflows.items():
             if thread_id.startswith(session_id) and not task.done():
                 # Extract domain from thread_id format: "session_id_domain"
                 try:
-                    domain = thread_id.split(f"{session_id}_", 1)[1]
-                    
-                    # Read current state atomically
-                    state = await self.read_domain_workflow_state(thread_id, domain)
-                    if state:
-                        contexts[domain] = {
-                            "thread_id": thread_id,
-                            "status": state.get("workflow_status", "unknown"),
-                            "progress": state.get("progress", 0.0),
-                            "current_step": state.get("current_step", "unknown"),
-                            "partial_results": {
-                                k: v for k, v in state.items() 
-                                if k.endswith("_results") or k.endswith("_analysis")
-                            }
-                        }
+                    targets.append((thread_id, thread_id.split(f"{session_id}_", 1)[1]))
                 except Exception as e:
                     print(f"❌ Error processing thread_id {thread_id}: {e}")
                     continue
         
+        # Read current states atomically and concurrently - total latency is the
+        # slowest read rather than the sum of all reads
+        states = await asyncio.gather(
+            *(self.read_domain_workflow_state(thread_id, domain) for thread_id, domain in targets)
+        )
+        
+        for (thread_id, domain), state in zip(targets, states):
+            if state:
+                contexts[domain] = {
+                    "thread_id": thread_id,
+                    "status": state.get("workflow_status", "unknown"),
+                    "progress": state.get("progress", 0.0),
+                    "current_step": state.get("current_step", "unknown"),
+                    "partial_results": {
+                        k: v for k, v in state.items() 
+                        if k.endswith("_results") or k.endswith("_analysis")
+                    }
+                }
+        
         return contexts
 
 
@@ -277,6 +283,12 @@ class AsyncOrchestrationSystem:
         # Pending approvals (for human-in-the-loop)
         self.pending_approvals: Dict[str, Dict[str, Any]] = {}
         
+        # Domain-specific state fields, dispatched by domain name
+        self._domain_state_builders = {
+            "exercise_planning": self._exercise_state_fields,
+            "finance": self._finance_state_fields,
+        }
+        
         # Create main orchestrator
         self.main_orchestrator = self._create_main_orchestrator()
     
@@ -486,22 +498,29 @@ class AsyncOrchestrationSystem:
         }
         
         # Add domain-specific fields
-        if domain == "exercise_planning":
-            base_state.update({
-                "requirements_history": [main_state["user_message"]],
-                "exercise_results": None,
-                "final_plan": None
-            })
-        elif domain == "finance":
-            base_state.update({
-                "transaction_details": {},
-                "risk_analysis": None,
-                "compliance_check": None,
-                "execution_result": None
-            })
+        domain_fields = self._domain_state_builders.get(domain)
+        if domain_fields:
+            base_state.update(domain_fields(main_state))
         
         return base_state
     
+    @staticmethod
+    def _exercise_state_fields(main_state: IntentState) -> dict:
+        return {
+            "requirements_history": [main_state["user_message"]],
+            "exercise_results": None,
+            "final_plan": None
+        }
+    
+    @staticmethod
+    def _finance_state_fields(main_state: IntentState) -> dict:
+        return {
+            "transaction_details": {},
+            "risk_analysis": None,
+            "compliance_check": None,
+            "execution_result": None
+        }
+    
     async def _run_domain_workflow_async(self, domain: str, domain_state: dict, thread_id: str):
         """Run domain workflow asynchronously with lifecycle tracking"""
         session_id = thread_id.split(f"_{domain}")[0]
@@ -0,0 +1,77 @@
+"""
+Logging Configuration
+
+Routes log records through a queue. Records are formatted in the calling thread
+(QueueHandler.prepare), but the blocking stream and file writes happen on a
+background listener thread instead of the event loop.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+from typing import List, Optional, Tuple
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+_listener: Optional[logging.handlers.QueueListener] = None
+# Arguments of the active configuration, so repeated identical calls are no-ops
+_configured_with: Optional[Tuple[str, Optional[str]]] = None
+
+
+def _stop_listener() -> None:
+    """Flush and stop the background listener, if one is running."""
+    global _listener, _configured_with
+
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+    _configured_with = None
+
+
+def setup_logging(log_level: str = "INFO", log_file: Optional[str] = None) -> None:
+    """
+    Configure the root logger with a non-blocking queue handler.
+
+    Args:
+        log_level: Root log level name (e.g. "DEBUG", "INFO")
+        log_file: Optional path of a rotating log file written by the listener thread
+    """
+    global _listener, _configured_with
+
+    if _listener is not None and _configured_with == (log_level, log_file):
+        return
+
+    _stop_listener()
+
+    # LOG_FORMAT uses no caller, thread or process fields, so skip collecting them
+    # per record (see "Optimization" in the logging HOWTO)
+    logging._srcfile = None
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers: List[logging.Handler] = [logging.StreamHandler()]
+    if log_file:
+        # delay=True opens the file on the first record, not at setup
+        handlers.append(
+            logging.handlers.RotatingFileHandler(log_file, maxBytes=10 * 1024 * 1024, backupCount=5, delay=True)
+        )
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers.clear()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(log_level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    _configured_with = (log_level, log_file)
+
+
+atexit.register(_stop_listener)
@@ -6,20 +6,28 @@ to classify user input according to intent domain and intent type with confidenc
 """
 
 import asyncio
-from typing import List
+import logging
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Tuple
 
 from dotenv import load_dotenv
 from google import genai
 from google.genai import types
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 # Load environment variables from .env file (look in parent directory)
 load_dotenv(dotenv_path="../.env")
 
+logger = logging.getLogger(__name__)
+
 
 class Tag(BaseModel):
     """Individual tag for a sentence or phrase"""
 
+    # Frozen because cached and single-flight results are shared between callers
+    model_config = ConfigDict(frozen=True)
+
     intent_domain: str
     intent_type: str
     confidence_score: float
@@ -29,74 +37,71 @@ class Tag(BaseModel):
 
 MODEL = "gemini-2.5-flash-lite-preview-06-17"
 
+# Vocabulary the prompt allows; tags outside it are discarded before routing
+INTENT_DOMAINS = frozenset({"exercise_planning", "social_interaction", "creative_generation", "other"})
+INTENT_TYPES = frozenset({"Query", "Create Request", "Update Request", "Delete Request"})
+
 SYSTEM_PROMPT = """
-Analyze the user and agent's chat history, classify the LATEST MESSAGE's intent domain and intent type, determine the input type, and capture the context for the user's intent. The input can have one or multiple intents.
-
-**Intent domain:**
-- "exercise_planning": Requests related to exercise planning.
-- "social_interaction": Casual conversation or greetings.
-- "creative_generation": Requests for creative content.
-- "other": Unclassified intent domains.
-
-**Intent type:**
-- "Query": User searches or asks about something that already exists or information already available.
-- "Create Request": User explicitly requests the creation of something new.
-- "Update Request": User requests changes or modifications to something previously created.
-- "Delete Request": User explicitly requests deleting the previous requests.
-
-Steps:
-1. Analyze User Input: Examine the user's text to understand the context and gather information about their request.
-2. Classify Intent Domain: Determine which of the specified domains the user's request falls into.
-3. Classify Intent Type: Categorize the user's request into one or more of the specified intent types.
-4. Determine Confidence: Decide on a confidence score between 0.0 and 1.0 based on the clarity of the classification.
-5. Extract User's Words: Identify and include the specific words or phrases from the user's input that contribute to the classification.
-6. Capture Context: Identify and record any contextual information surrounding the user's intent.
-
-# Output Format
-
-Each intent should be represented as an entry with the determined fields:
-- intent_domain
-- intent_type
-- confidence_score
-- tagged_sentences
-- context
-
-# Examples
-
-Input: "Can you help me plan an exercise routine for the week?"
-- intent_domain: "exercise_planning"
-- intent_type: "Create Request" 
-- confidence_score: 0.95
-- tagged_sentences: "plan an exercise routine"
-- context: "User is preparing a weekly exercise plan."
-
-Input: "Write a short story about a hero."
-- intent_domain: "creative_generation"
-- intent_type: "Create Request"
-- confidence_score: 0.85
-- tagged_sentences: "write a short story"
-- context: "User is interested in storytelling about heroic figures."
-
-Input: "I'm not sure what I want."
-- intent_domain: "other"
-- intent_type: "Query"
-- confidence_score: 0.30
-- tagged_sentences: "not sure what I want"
-- context: "User is uncertain and exploratory."
-
-Input: "I would like to update my exercise routine and write a poem."
-Should produce two tags:
-1. intent_domain: "exercise_planning", intent_type: "Update Request", confidence_score: 0.80, tagged_sentences: "update my exercise routine", context: "User is modifying existing exercise plans."
-2. intent_domain: "creative_generation", intent_type: "Create Request", confidence_score: 0.75, tagged_sentences: "write a poem", context: "User expresses an interest in poetry writing."
-
-# Notes
-
-- Make sure to match the intent types and domains closely to the user input based on context clues within the text.
-- If any part of the input does not clearly fit into the categories, classify it as "other".
-- Consider any specific vocabulary or context in the input that might suggest its intent type.
-- Confidence scores should reflect how certain you are about the classification (0.0 = very uncertain, 1.0 = very certain).
+Classify the intent of the LATEST MESSAGE in the user/agent chat history. A message can carry one or more intents; return one entry per intent.
+
+Intent domains:
+- "exercise_planning": requests related to exercise planning
+- "social_interaction": casual conversation or greetings
+- "creative_generation": requests for creative content
+- "other": anything that does not clearly fit the above
+
+Intent types:
+- "Query": asks about something that already exists or information already available
+- "Create Request": explicitly asks to create something new
+- "Update Request": asks to change something previously created
+- "Delete Request": explicitly asks to delete previous requests
+
+For each intent:
+- intent_domain / intent_type: choose from the lists above, using vocabulary and earlier turns as clues
+- confidence_score: 0.0 (very uncertain) to 1.0 (very certain)
+- tagged_sentences: the user's own words that drove the classification
+- context: short description of the context around the user's intent
+
+Examples:
+- "Can you help me plan an exercise routine for the week?" -> exercise_planning, Create Request, 0.95, "plan an exercise routine", "User is preparing a weekly exercise plan."
+- "I'm not sure what I want." -> other, Query, 0.30, "not sure what I want", "User is uncertain and exploratory."
+- "I would like to update my exercise routine and write a poem." -> two intents:
+  1. exercise_planning, Update Request, 0.80, "update my exercise routine", "User is modifying existing exercise plans."
+  2. creative_generation, Create Request, 0.75, "write a poem", "User expresses an interest in poetry writing."
 """
 
+# Built once at import: the config (including the response schema derived from Tag)
+# is identical for every request, so there is no reason to rebuild it per instance.
+GENERATION_CONFIG = types.GenerateContentConfig(
+    system_instruction=SYSTEM_PROMPT,
+    thinking_config=types.ThinkingConfig(thinking_budget=512),
+    temperature=0,
+    response_mime_type="application/json",
+    response_schema=list[Tag],
+)
+
+
+@lru_cache(maxsize=1)
+def get_client() -> genai.Client:
+    """Return the process-wide Gemini client, created on first use"""
+    return genai.Client()
+
+
+# Classification requests currently in flight, keyed by conversation content, so
+# identical concurrent requests share one Gemini call
+_inflight: Dict[Tuple, "asyncio.Future[types.GenerateContentResponse]"] = {}
+
+
+# Tags from recent successful classifications. The model runs at temperature 0 and
+# classification has no side effects, so a repeated conversation can reuse its tags
+RESULT_CACHE_SIZE = 1024
+_results: "OrderedDict[Tuple, List[Tag]]" = OrderedDict()
+
+
+def _conversation_key(conversations: List[types.Content]) -> Tuple:
+    """Build a hashable key from the roles and texts of a conversation"""
+    return tuple((content.role, tuple(part.text for part in content.parts or ())) for content in conversations)
+
 
 class MessageTagger:
     """
@@ -104,18 +109,18 @@ class MessageTagger:
     and classify user input into intent domains and types with confidence scores.
     """
 
+    __slots__ = ("generation_config",)
+
     def __init__(self):
         """
         Initialize the MessageTagger with Google Gen AI SDK
         """
-        self.client = genai.Client()
-        self.generation_config = types.GenerateContentConfig(
-            system_instruction=SYSTEM_PROMPT,
-            thinking_config=types.ThinkingConfig(thinking_budget=512),
-            temperature=0,
-            response_mime_type="application/json",
-            response_schema=list[Tag],
-        )
+        self.generation_config = GENERATION_CONFIG
+
+    @property
+    def client(self) -> genai.Client:
+        """Shared Gemini client, created on the first classification rather than at construction"""
+        return get_client()
 
     async def classify_latest_message(self, conversations: List[types.Content]) -> List[Tag]:
         """
@@ -136,25 +141,54 @@ class MessageTagger:
             latest_message = conversations[-1]
             latest_text = latest_message.parts[0].text if latest_message.parts else ""
 
-            # Generate response using Gemini 2.5 Flash with structured output (async)
-            response = await self.client.aio.models.generate_content(
-                model=MODEL, contents=conversations, config=self.generation_config
-            )
-
-            # Use the parsed response directly
-            tags = response.parsed
+            key = _conversation_key(conversations)
+            cached = _results.get(key)
+            if cached is not None:
+                _results.move_to_end(key)
+                return list(cached)
+
+            # Generate response using Gemini 2.5 Flash with structured output (async),
+            # joining an identical request that is already in flight
+            pending = _inflight.get(key)
+            if pending is None:
+                pending = asyncio.ensure_future(
+                    self.client.aio.models.generate_content(
+                        model=MODEL, contents=conversations, config=self.generation_config
+                    )
+                )
+                _inflight[key] = pending
+                pending.add_done_callback(lambda _: _inflight.pop(key, None))
+            response = await asyncio.shield(pending)
+
+            # Keep only tags that use the allowed domain/type vocabulary
+            tags = [
+                tag
+                for tag in response.parsed or []
+                if tag.intent_domain in INTENT_DOMAINS and tag.intent_type in INTENT_TYPES
+            ]
 
             # Validate that we have at least one tag
             if not tags:
                 # Create a default tag if none found
                 tags = [
-                    Tag(intent_domain="other", intent_type="Query", confidence_score=0.0, tagged_sentences=latest_text)
+                    Tag(
+                        intent_domain="other",
+                        intent_type="Query",
+                        confidence_score=0.0,
+                        tagged_sentences=latest_text,
+                        context="No recognized intent in the latest message",
+                    )
                 ]
+            else:
+                # Only real classifications are cached; fallbacks should be retried
+                _results[key] = tags
+                if len(_results) > RESULT_CACHE_SIZE:
+                    _results.popitem(last=False)
 
-            return tags
+            return list(tags)
 
-        except Exception as e:
-            print(f"Error in message classification: {e}")
+        except Exception:
+            logger.exception("Error in message classification")
             # Get latest message text for fallback
             fallback_text = ""
             if conversations and conversations[-1].parts:
@@ -162,7 +196,13 @@ class MessageTagger:
 
             # Return fallback tag
             return [
-                Tag(intent_domain="other", intent_type="Query", confidence_score=0.0, tagged_sentences=fallback_text)
+                Tag(
+                    intent_domain="other",
+                    intent_type="Query",
+                    confidence_score=0.0,
+                    tagged_sentences=fallback_text,
+                    context="Classification failed",
+                )
             ]
 
 
@@ -5,7 +5,7 @@ This module provides unified message handling that can convert between
 Google Gemini format and LangChain format for consistent conversation management.
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import List, Optional
 
@@ -13,7 +13,7 @@ from google.genai import types
 from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
 
 
-@dataclass
+@dataclass(slots=True)
 class Message:
     """
     Universal message format that can convert to both Gemini and LangChain formats.
@@ -28,13 +28,17 @@ class Message:
     content: str
     timestamp: datetime
     source: str  # "user", "query_processor", "triage_agent", etc.
+    # Converted Gemini content, built on first use; messages are never edited after creation
+    _gemini_content: Optional[types.Content] = field(default=None, init=False, repr=False, compare=False)
     
     def to_gemini(self) -> types.Content:
-        """Convert to Google Gemini format."""
-        return types.Content(
-            role=self.role,
-            parts=[types.Part.from_text(text=self.content)]
-        )
+        """Convert to Google Gemini format (built once per message)."""
+        if self._gemini_content is None:
+            self._gemini_content = types.Content(
+                role=self.role,
+                parts=[types.Part.from_text(text=self.content)]
+            )
+        return self._gemini_content
     
     def to_langchain(self) -> BaseMessage:
         """Convert to LangChain format."""
@@ -137,20 +141,19 @@ class ConversationManager:
         self.max_messages = max_messages
     
     def to_gemini_format(self, messages: List[Message]) -> List[types.Content]:
-        """Convert list of Messages to Gemini format."""
-        return [msg.to_gemini() for msg in messages]
+        """Convert list of Messages to Gemini format, skipping blank messages."""
+        return [msg.to_gemini() for msg in messages if msg.content and not msg.content.isspace()]
     
     def to_langchain_format(self, messages: List[Message]) -> List[BaseMessage]:
         """Convert list of Messages to LangChain format."""
         return [msg.to_langchain() for msg in messages]
     
     def apply_sliding_window(self, messages: List[Message]) -> List[Message]:
-        """Apply sliding window to keep only recent messages."""
-        if len(messages) <= self.max_messages:
-            return messages
-        
-        # Keep the most recent messages
-        return messages[-self.max_messages:]
+        """Apply sliding window in place, keeping only the most recent messages."""
+        overflow = len(messages) - self.max_messages
+        if overflow > 0:
+            del messages[:overflow]
+        return messages
     
     def get_user_messages_only(self, messages: List[Message]) -> List[Message]:
         """Filter to get only user messages."""
@@ -158,8 +161,11 @@ class ConversationManager:
     
     def get_latest_user_message(self, messages: List[Message]) -> Optional[Message]:
         """Get the most recent user message."""
-        user_messages = self.get_user_messages_only(messages)
-        return user_messages[-1] if user_messages else None
+        # Scan from the end so a turn only touches the tail of the history
+        for msg in reversed(messages):
+            if msg.role == "user":
+                return msg
+        return None
     
     def get_conversation_context(self, messages: List[Message], include_system: bool = True) -> str:
         """Get conversation as formatted string for context."""
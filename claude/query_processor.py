@@ -7,6 +7,7 @@ context, integrate with LLM for response generation with domain awareness.
 
 import re
 from datetime import datetime
+from types import MappingProxyType
 from typing import Any, Dict, List, Optional, TYPE_CHECKING
 
 from langchain_core.messages import HumanMessage, SystemMessage
@@ -18,6 +19,47 @@ if TYPE_CHECKING:
     from claude.session_manager import ChatSession
 
 
+# Patterns for reading domain and workflow lines back out of the formatted context
+DOMAIN_LINE_PATTERN = re.compile(r'^Domain: (\w+)', re.MULTILINE)
+WORKFLOW_LINE_PATTERN = re.compile(r'  (?:Completed )?Workflow:')
+
+# Keywords that make a query relevant to a domain
+DOMAIN_KEYWORDS = MappingProxyType({
+    "finance": ("portfolio", "stock", "investment", "money", "transfer", "analysis"),
+    "hr": ("employee", "onboard", "documents", "orientation", "hiring"),
+    "it": ("access", "provision", "system", "server", "deployment"),
+    "analytics": ("data", "analysis", "report", "dashboard", "metrics"),
+})
+
+NO_CONTEXT_SYSTEM_PROMPT = """You are a helpful assistant for a multi-domain workflow management system.
+The user currently has no active workflows in their session.
+
+Conversation Context: The most recent {conversation_length} messages of this conversation are included. Use the conversation history to understand context and references.
+
+Instructions:
+- Provide helpful, concise responses to their queries
+- Reference previous parts of the conversation when relevant
+- If they ask about "it", "that", or "the previous one", use conversation context to understand what they mean
+- Maintain a professional but friendly tone"""
+
+CONTEXT_SYSTEM_PROMPT = """You are a helpful assistant for a multi-domain workflow management system.
+
+Current Session Context:
+{formatted_context}
+
+Conversation Context: The most recent {conversation_length} messages of this conversation are included. Use the conversation history to understand context and references.
+
+Instructions:
+- Use the provided context to answer the user's query accurately
+- Reference previous parts of the conversation when relevant (e.g., "the finance workflow we discussed")
+- Be concise and relevant to their specific question
+- Reference specific workflow details when relevant
+- If asking about status, provide current progress and next steps
+- If no relevant context exists, acknowledge this clearly
+- If they use pronouns like "it", "that", or "the previous one", use conversation context to understand what they mean
+- Maintain a professional but friendly tone"""
+
+
 class QueryProcessor:
     """Processes queries with multi-domain context and LLM integration."""
 
@@ -25,7 +67,8 @@ class QueryProcessor:
         self, 
         llm: Optional[Any] = None, 
         context_aggregator: Optional[ContextAggregator] = None,
-        max_context_size: int = 8000
+        max_context_size: int = 8000,
+        max_history_messages: int = 20
     ):
         """
         Initialize the query processor.
@@ -34,6 +77,7 @@ class QueryProcessor:
             llm: Language model for query processing (defaults to GPT-4)
             context_aggregator: Context aggregator instance
             max_context_size: Maximum context size for LLM
+            max_history_messages: Number of recent conversation messages sent to the LLM
         """
         if llm is not None:
             self.llm = llm
@@ -45,6 +89,7 @@ class QueryProcessor:
                 self.llm = None
         self.context_aggregator = context_aggregator or ContextAggregator(max_context_size=max_context_size)
         self.max_context_size = max_context_size
+        self.max_history_messages = max_history_messages
 
     async def process_query(
         self,
@@ -84,15 +129,18 @@ class QueryProcessor:
                 session=session,
                 filter_domains=filter_domains,
                 summarize=True,  # Always summarize for queries
-                include_messages=True,  # Always include conversation context now
-                max_messages=10  # Increased since we're using conversation history
+                # Conversation history is passed to the LLM directly below, so the
+                # aggregator does not need to copy recent messages into the context
             )
 
             # Extract domains referenced
             domains_referenced = self._extract_domain_names(context["formatted_context"])
 
             # Build LLM prompt with context and conversation history
-            conversation_history = session.get_conversation_for_langchain(include_system=False)
+            # Only the most recent turns go to the LLM
+            conversation_history = session.get_conversation_for_langchain(
+                include_system=False, limit=self.max_history_messages
+            )
             system_message = self._build_system_prompt(context, conversation_history)
             
             # Use conversation history instead of single message
@@ -103,7 +151,7 @@ class QueryProcessor:
             response_content = llm_response.content
 
             # Calculate confidence score
-            confidence = self._calculate_confidence(context, query, response_content)
+            confidence = self._calculate_confidence(context, query, response_content, domains_referenced)
 
             # Store AI response in session
             session.add_ai_message(response_content, source="query_processor")
@@ -114,7 +162,7 @@ class QueryProcessor:
                 "domains_referenced": domains_referenced,
                 "confidence": confidence,
                 "timestamp": datetime.now().isoformat(),
-                "context_summary": self._summarize_context(context)
+                "context_summary": self._summarize_context(context, domains_referenced)
             }
 
             return result
@@ -134,46 +182,22 @@ class QueryProcessor:
         
         formatted_context = context.get("formatted_context", "")
         
-        # Count conversation messages for context
+        # Count the (windowed) conversation messages sent with the prompt
         conversation_length = len(conversation_history)
         
         if not formatted_context or formatted_context == "No active workflows":
             # No workflows - simple response
-            prompt = f"""You are a helpful assistant for a multi-domain workflow management system.
-The user currently has no active workflows in their session.
-
-Conversation Context: This conversation has {conversation_length} previous messages. Use the conversation history to understand context and references.
-
-Instructions:
-- Provide helpful, concise responses to their queries
-- Reference previous parts of the conversation when relevant
-- If they ask about "it", "that", or "the previous one", use conversation context to understand what they mean
-- Maintain a professional but friendly tone"""
+            prompt = NO_CONTEXT_SYSTEM_PROMPT.format(conversation_length=conversation_length)
         else:
-            prompt = f"""You are a helpful assistant for a multi-domain workflow management system.
-
-Current Session Context:
-{formatted_context}
-
-Conversation Context: This conversation has {conversation_length} previous messages. Use the conversation history to understand context and references.
-
-Instructions:
-- Use the provided context to answer the user's query accurately
-- Reference previous parts of the conversation when relevant (e.g., "the finance workflow we discussed")
-- Be concise and relevant to their specific question
-- Reference specific workflow details when relevant
-- If asking about status, provide current progress and next steps
-- If no relevant context exists, acknowledge this clearly
-- If they use pronouns like "it", "that", or "the previous one", use conversation context to understand what they mean
-- Maintain a professional but friendly tone"""
+            prompt = CONTEXT_SYSTEM_PROMPT.format(
+                formatted_context=formatted_context, conversation_length=conversation_length
+            )
 
         return SystemMessage(content=prompt)
 
     def _extract_domain_names(self, formatted_context: str) -> List[str]:
         """Extract domain names from formatted context string."""
-        import re
-        domain_matches = re.findall(r'^Domain: (\w+)', formatted_context, re.MULTILINE)
-        return domain_matches
+        return DOMAIN_LINE_PATTERN.findall(formatted_context)
 
     def _indent_text(self, text: str, spaces: int) -> str:
         """Indent text by specified number of spaces."""
@@ -181,8 +205,10 @@ Instructions:
         return "\n".join(indent + line for line in text.split("\n"))
 
 
-    def _calculate_confidence(self, context: Dict[str, Any], query: str, response: str) -> float:
-        """Calculate confidence score for the query response."""
+    def _calculate_confidence(
+        self, context: Dict[str, Any], query: str, response: str, domain_names: Optional[List[str]] = None
+    ) -> float:
+        """Calculate confidence score for the query response (reuses domain_names if already extracted)."""
         confidence = 0.5  # Base confidence
         
         formatted_context = context.get("formatted_context", "")
@@ -193,7 +219,8 @@ Instructions:
         
         # Increase confidence if query matches workflow domains
         query_lower = query.lower()
-        domain_names = self._extract_domain_names(formatted_context)
+        if domain_names is None:
+            domain_names = self._extract_domain_names(formatted_context)
         for domain in domain_names:
             if domain.lower() in query_lower:
                 confidence += 0.1
@@ -213,20 +240,18 @@ Instructions:
         
         return min(1.0, max(0.0, confidence))
 
-    def _summarize_context(self, context: Dict[str, Any]) -> str:
-        """Create a brief summary of the context used."""
+    def _summarize_context(self, context: Dict[str, Any], domain_names: Optional[List[str]] = None) -> str:
+        """Create a brief summary of the context used (reuses domain_names if already extracted)."""
         formatted_context = context.get("formatted_context", "")
         
         if not formatted_context or formatted_context == "No active workflows":
             return "No active workflows"
         
-        domain_names = self._extract_domain_names(formatted_context)
+        if domain_names is None:
+            domain_names = self._extract_domain_names(formatted_context)
         
         # Count workflows by counting workflow lines
-        import re
-        workflow_matches = re.findall(r'  Workflow:', formatted_context)
-        completed_matches = re.findall(r'  Completed Workflow:', formatted_context)
-        workflow_count = len(workflow_matches) + len(completed_matches)
+        workflow_count = len(WORKFLOW_LINE_PATTERN.findall(formatted_context))
         
         summary = f"{workflow_count} workflow(s) across {len(domain_names)} domain(s): {', '.join(domain_names)}"
         
@@ -265,18 +290,8 @@ Instructions:
                 relevance += 0.1
         
         # Domain-specific keywords
-        domain_keywords = {
-            "finance": ["portfolio", "stock", "investment", "money", "transfer", "analysis"],
-            "hr": ["employee", "onboard", "documents", "orientation", "hiring"],
-            "it": ["access", "provision", "system", "server", "deployment"],
-            "analytics": ["data", "analysis", "report", "dashboard", "metrics"]
-        }
-        
-        if domain in domain_keywords:
-            for keyword in domain_keywords[domain]:
-                if keyword in query_lower:
-                    relevance += 0.1
-                    break
+        if any(keyword in query_lower for keyword in DOMAIN_KEYWORDS.get(domain, ())):
+            relevance += 0.1
         
         return min(1.0, relevance)
 
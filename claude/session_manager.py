@@ -9,6 +9,7 @@ This module provides simplified session management that supports:
 """
 
 import asyncio
+import logging
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from typing import Dict, Optional, Any, List, Set
@@ -17,6 +18,8 @@ from functools import wraps
 from claude.domain_models import RunningWorkflow, PendingApproval
 from claude.message_types import Message, ConversationManager
 
+logger = logging.getLogger(__name__)
+
 
 def updates_activity(method):
     """Decorator to automatically update activity timestamp after method execution"""
@@ -103,9 +106,7 @@ class ChatSession:
     
     def get_all_domains(self) -> Set[str]:
         """Get all domains with workflows or pending approvals"""
-        domains = set(self.workflows.keys())
-        domains.update(self.pending_approvals.keys())
-        return domains
+        return self.workflows.keys() | self.pending_approvals.keys()
     
     def update_activity(self):
         """Update last activity timestamp"""
@@ -116,40 +117,48 @@ class ChatSession:
         """Add structured message to history and update activity"""
         self.message_history.append(message)
         # Apply sliding window to keep memory usage under control
-        self.message_history = self.conversation_manager.apply_sliding_window(self.message_history)
+        self.conversation_manager.apply_sliding_window(self.message_history)
     
-    @updates_activity
     def add_user_message(self, content: str):
         """Add user message to history"""
         message = Message.from_user(content)
         self.add_message(message)
     
-    @updates_activity
     def add_ai_message(self, content: str, source: str = "ai"):
         """Add AI/model message to history"""
         message = Message.from_ai(content, source)
         self.add_message(message)
     
-    @updates_activity
     def add_system_message(self, content: str, source: str = "system"):
         """Add system message to history"""
         message = Message.from_system(content, source)
         self.add_message(message)
     
-    def get_conversation_history(self, include_system: bool = True) -> List[Message]:
-        """Get conversation history, optionally excluding system messages"""
-        if include_system:
-            return self.message_history.copy()
-        return [msg for msg in self.message_history if msg.role != "system"]
-    
-    def get_conversation_for_gemini(self, include_system: bool = True) -> List:
+    def get_conversation_history(self, include_system: bool = True, limit: Optional[int] = None) -> List[Message]:
+        """Get conversation history, optionally excluding system messages and keeping only the last `limit`"""
+        if limit is None:
+            if include_system:
+                return self.message_history.copy()
+            return [msg for msg in self.message_history if msg.role != "system"]
+        
+        # Walk back from the newest message so only the requested tail is visited
+        recent = []
+        for msg in reversed(self.message_history):
+            if len(recent) >= limit:
+                break
+            if include_system or msg.role != "system":
+                recent.append(msg)
+        recent.reverse()
+        return recent
+    
+    def get_conversation_for_gemini(self, include_system: bool = True, limit: Optional[int] = None) -> List:
         """Get conversation in Gemini format"""
-        messages = self.get_conversation_history(include_system)
+        messages = self.get_conversation_history(include_system, limit)
         return self.conversation_manager.to_gemini_format(messages)
     
-    def get_conversation_for_langchain(self, include_system: bool = True) -> List:
+    def get_conversation_for_langchain(self, include_system: bool = True, limit: Optional[int] = None) -> List:
         """Get conversation in LangChain format"""
-        messages = self.get_conversation_history(include_system)
+        messages = self.get_conversation_history(include_system, limit)
         return self.conversation_manager.to_langchain_format(messages)
     
     def get_latest_user_message(self) -> Optional[Message]:
@@ -161,15 +170,16 @@ class ChatSession:
         messages = self.get_conversation_history(include_system)
         return self.conversation_manager.get_conversation_context(messages, include_system)
     
-    def is_expired(self, timeout_minutes: int = 30) -> bool:
-        """Check if session has expired due to inactivity"""
-        return datetime.now() > self.last_activity + timedelta(minutes=timeout_minutes)
+    def is_expired(self, timeout_minutes: int = 30, now: Optional[datetime] = None) -> bool:
+        """Check if session has expired due to inactivity (as of ``now``, default current time)"""
+        return (now or datetime.now()) > self.last_activity + timedelta(minutes=timeout_minutes)
     
-    def cleanup_expired_approvals(self) -> int:
+    def cleanup_expired_approvals(self, now: Optional[datetime] = None) -> int:
         """Clean up expired approvals and return count removed"""
+        now = now or datetime.now()
         expired_domains = []
         for domain, approval in self.pending_approvals.items():
-            if not approval.is_pending():
+            if not approval.is_pending(now):
                 expired_domains.append(domain)
         
         for domain in expired_domains:
@@ -184,8 +194,8 @@ class ChatSession:
             "created_at": self.created_at.isoformat(),
             "last_activity": self.last_activity.isoformat(),
             "message_count": len(self.message_history),
-            "workflow_domains": list(self.workflows.keys()),
-            "pending_approval_domains": list(self.pending_approvals.keys()),
+            "workflow_domains": list(self.workflows),
+            "pending_approval_domains": list(self.pending_approvals),
             "total_domains": len(self.get_all_domains())
         }
 
@@ -203,6 +213,10 @@ class SessionManager:
         if start_cleanup:
             self._start_cleanup_task()
     
+    def start_cleanup(self):
+        """Start the periodic cleanup loop (call once an event loop is running)"""
+        self._start_cleanup_task()
+    
     def _start_cleanup_task(self):
         """Start background cleanup task"""
         try:
@@ -217,20 +231,21 @@ class SessionManager:
         while True:
             try:
                 await asyncio.sleep(60)  # Cleanup every minute
-                self.cleanup_expired()
-            except Exception as e:
-                print(f"Error in session cleanup: {e}")
+                await self.cleanup_expired_in_batches()
+            except Exception:
+                logger.exception("Error in session cleanup")
     
     def create_session(self, session_id: str) -> ChatSession:
         """Create new session or return existing"""
-        if session_id not in self.sessions:
-            self.sessions[session_id] = ChatSession(session_id=session_id)
+        session = self.sessions.get(session_id)
+        if session is None:
+            session = self.sessions[session_id] = ChatSession(session_id=session_id)
             print(f"Created new session: {session_id}")
         else:
             # Update activity for existing session
-            self.sessions[session_id].update_activity()
+            session.update_activity()
         
-        return self.sessions[session_id]
+        return session
     
     def get_session(self, session_id: str) -> Optional[ChatSession]:
         """Get existing session"""
@@ -241,32 +256,38 @@ class SessionManager:
     
     def delete_session(self, session_id: str) -> bool:
         """Delete session and cleanup resources"""
-        if session_id in self.sessions:
-            session = self.sessions[session_id]
-            
-            # Cancel workflow tasks if running
-            for workflow in session.workflows.values():
-                if workflow.task and not workflow.task.done():
-                    workflow.task.cancel()
-            
-            del self.sessions[session_id]
-            print(f"Deleted session: {session_id}")
-            return True
-        return False
+        session = self.sessions.pop(session_id, None)
+        if session is None:
+            return False
+        
+        # Cancel workflow tasks if running
+        for workflow in session.workflows.values():
+            if workflow.task and not workflow.task.done():
+                workflow.task.cancel()
+        
+        print(f"Deleted session: {session_id}")
+        return True
     
-    def cleanup_expired(self) -> Dict[str, int]:
-        """Clean up expired sessions and approvals"""
+    def cleanup_expired(self, session_ids: Optional[List[str]] = None) -> Dict[str, int]:
+        """Clean up expired sessions and approvals, optionally only among the given session IDs"""
         stats = {"expired_sessions": 0, "expired_approvals": 0}
         
+        # One timestamp for the whole pass, so every session is judged against the same instant
+        now = datetime.now()
         expired_sessions = []
         
-        for session_id, session in self.sessions.items():
+        if session_ids is None:
+            candidates = self.sessions.items()
+        else:
+            candidates = [(sid, self.sessions[sid]) for sid in session_ids if sid in self.sessions]
+        
+        for session_id, session in candidates:
             # Clean up expired approvals within each session
-            expired_count = session.cleanup_expired_approvals()
+            expired_count = session.cleanup_expired_approvals(now)
             stats["expired_approvals"] += expired_count
             
             # Check for expired sessions
-            if session.is_expired(self.session_timeout):
+            if session.is_expired(self.session_timeout, now):
                 expired_sessions.append(session_id)
         
         # Delete expired sessions
@@ -276,16 +297,32 @@ class SessionManager:
         
         return stats
     
+    async def cleanup_expired_in_batches(self, batch_size: int = 500) -> Dict[str, int]:
+        """Clean up expired sessions in bounded batches, yielding to the event loop between batches"""
+        stats = {"expired_sessions": 0, "expired_approvals": 0}
+        session_ids = list(self.sessions)
+        
+        for start in range(0, len(session_ids), batch_size):
+            batch_stats = self.cleanup_expired(session_ids[start:start + batch_size])
+            for key, count in batch_stats.items():
+                stats[key] += count
+            await asyncio.sleep(0)
+        
+        return stats
+    
     def get_session_stats(self) -> Dict[str, Any]:
         """Get overall session statistics"""
         total_sessions = len(self.sessions)
-        total_workflows = sum(len(s.workflows) for s in self.sessions.values())
-        total_pending_approvals = sum(len(s.pending_approvals) for s in self.sessions.values())
-        
-        # Domain statistics
+        total_workflows = 0
+        total_pending_approvals = 0
         all_domains = set()
+        
+        # Single pass over sessions for workflow, approval and domain statistics
         for session in self.sessions.values():
-            all_domains.update(session.get_all_domains())
+            total_workflows += len(session.workflows)
+            total_pending_approvals += len(session.pending_approvals)
+            all_domains.update(session.workflows)
+            all_domains.update(session.pending_approvals)
         
         return {
             "total_sessions": total_sessions,
@@ -366,6 +366,44 @@ def test_session_manager_delete_session():
     assert not deleted_again
 
 
+def test_session_manager_cleanup_in_batches():
+    """Should remove expired sessions across several cleanup batches"""
+    import asyncio
+
+    from claude.session_manager import SessionManager
+
+    manager = SessionManager(start_cleanup=False)
+    for i in range(5):
+        session = manager.create_session(f"session_{i}")
+        if i % 2 == 0:
+            session.last_activity = datetime.now() - timedelta(minutes=31)
+
+    stats = asyncio.run(manager.cleanup_expired_in_batches(batch_size=2))
+
+    assert stats["expired_sessions"] == 3
+    assert set(manager.sessions) == {"session_1", "session_3"}
+
+
+def test_session_manager_start_cleanup():
+    """Should start the cleanup loop on demand and stop it on shutdown"""
+    import asyncio
+
+    from claude.session_manager import SessionManager
+
+    async def run_test():
+        manager = SessionManager(start_cleanup=False)
+        assert manager._cleanup_task is None
+
+        manager.start_cleanup()
+        assert manager._cleanup_task is not None and not manager._cleanup_task.done()
+
+        await manager.shutdown()
+        await asyncio.sleep(0)
+        assert manager._cleanup_task.cancelled()
+
+    asyncio.run(run_test())
+
+
 def test_session_manager_stats():
     """Should provide session statistics"""
     from claude.session_manager import SessionManager
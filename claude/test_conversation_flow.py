@@ -133,6 +133,42 @@ def test_message_format_conversion():
     assert all(msg.role != "system" for msg in no_system_messages)
 
 
+def test_gemini_conversion_is_reused():
+    """Should build each message's Gemini content only once"""
+    from claude.message_types import Message
+
+    message = Message.from_user("Hello")
+
+    assert message.to_gemini() is message.to_gemini()
+    assert message == Message(role="user", content="Hello", timestamp=message.timestamp, source="user")
+
+
+def test_gemini_format_skips_blank_messages():
+    """Should leave blank messages out of the Gemini history"""
+    from claude.message_types import ConversationManager, Message
+
+    messages = [Message.from_user("Hello"), Message.from_ai("  "), Message.from_user("")]
+
+    gemini_messages = ConversationManager().to_gemini_format(messages)
+    assert len(gemini_messages) == 1
+    assert gemini_messages[0].parts[0].text == "Hello"
+
+
+def test_conversation_history_limit():
+    """Should return only the most recent messages when a limit is given"""
+    from claude.session_manager import ChatSession
+
+    session = ChatSession("limit_test")
+    session.add_user_message("First")
+    session.add_ai_message("Second")
+    session.add_system_message("Notice")
+    session.add_user_message("Third")
+
+    assert [m.content for m in session.get_conversation_history(limit=2)] == ["Notice", "Third"]
+    assert [m.content for m in session.get_conversation_history(include_system=False, limit=2)] == ["Second", "Third"]
+    assert session.get_conversation_history(limit=0) == []
+
+
 def test_empty_conversation_handling():
     """Should handle empty conversation gracefully"""
     from claude.query_processor import QueryProcessor
@@ -0,0 +1,180 @@
+"""
+Tests for MessageTagger
+
+The Gemini client is mocked, so these cover how responses are filtered and
+shared rather than the model's classifications.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from google.genai import types
+from pydantic import ValidationError
+
+from claude import message_tagger
+from claude.message_tagger import MessageTagger, Tag
+
+
+# Helpers
+def make_conversation(text: str):
+    """Build a single-message user conversation"""
+    return [types.Content(role="user", parts=[types.Part.from_text(text=text)])]
+
+
+def make_tag(intent_domain: str = "exercise_planning", intent_type: str = "Create Request") -> Tag:
+    """Build a tag as the model would return it"""
+    return Tag(
+        intent_domain=intent_domain,
+        intent_type=intent_type,
+        confidence_score=0.9,
+        tagged_sentences="plan my week",
+        context="User wants a weekly plan",
+    )
+
+
+# Fixtures
+@pytest.fixture
+def mock_client():
+    """Patch the shared Gemini client and reset module-level state around each test"""
+    message_tagger._inflight.clear()
+    message_tagger._results.clear()
+    client = Mock()
+    client.aio.models.generate_content = AsyncMock()
+    with patch.object(message_tagger, "get_client", return_value=client):
+        yield client
+    message_tagger._inflight.clear()
+    message_tagger._results.clear()
+
+
+def set_response(client, tags):
+    """Make the mocked client return the given parsed tags"""
+    client.aio.models.generate_content.return_value = Mock(parsed=tags)
+
+
+# Tests for vocabulary filtering
+def test_out_of_vocabulary_tags_fall_back_to_other_query(mock_client):
+    """Should return the default other/Query tag when no tag uses the allowed vocabulary"""
+    set_response(mock_client, [make_tag(intent_domain="fitness")])
+
+    tags = asyncio.run(MessageTagger().classify_latest_message(make_conversation("get me fit")))
+
+    assert len(tags) == 1
+    assert tags[0].intent_domain == "other"
+    assert tags[0].intent_type == "Query"
+    assert tags[0].confidence_score == 0.0
+    assert tags[0].tagged_sentences == "get me fit"
+
+
+def test_client_error_falls_back_to_other_query(mock_client):
+    """Should return the default tag instead of raising when the API call fails"""
+    mock_client.aio.models.generate_content.side_effect = RuntimeError("API down")
+
+    tags = asyncio.run(MessageTagger().classify_latest_message(make_conversation("hello")))
+
+    assert [(tag.intent_domain, tag.intent_type) for tag in tags] == [("other", "Query")]
+
+
+def block_response(client, tags):
+    """Make the mocked client wait for the returned event before answering"""
+    release = asyncio.Event()
+
+    async def generate_content(**kwargs):
+        await release.wait()
+        return Mock(parsed=tags)
+
+    client.aio.models.generate_content.side_effect = generate_content
+    return release
+
+
+# Tests for single-flight deduplication
+def test_concurrent_identical_calls_share_one_request(mock_client):
+    """Should make one Gemini call for identical concurrent classifications"""
+    tagger = MessageTagger()
+    conversation = make_conversation("plan my week")
+
+    async def run_test():
+        release = block_response(mock_client, [make_tag()])
+        tasks = [asyncio.create_task(tagger.classify_latest_message(conversation)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        return await asyncio.gather(*tasks)
+
+    results = asyncio.run(run_test())
+
+    assert mock_client.aio.models.generate_content.await_count == 1
+    assert all(tags[0].intent_domain == "exercise_planning" for tags in results)
+    assert message_tagger._inflight == {}
+
+
+def test_cancelled_waiter_does_not_cancel_shared_request(mock_client):
+    """Should still deliver the result to other waiters when one of them is cancelled"""
+    tagger = MessageTagger()
+    conversation = make_conversation("plan my week")
+
+    async def run_test():
+        release = block_response(mock_client, [make_tag()])
+        tasks = [asyncio.create_task(tagger.classify_latest_message(conversation)) for _ in range(3)]
+        await asyncio.sleep(0)
+        tasks[0].cancel()
+        await asyncio.sleep(0)
+        release.set()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    results = asyncio.run(run_test())
+
+    assert isinstance(results[0], asyncio.CancelledError)
+    assert all(tags[0].intent_domain == "exercise_planning" for tags in results[1:])
+    assert mock_client.aio.models.generate_content.await_count == 1
+    assert message_tagger._inflight == {}
+
+
+# Tests for the result cache
+def test_repeated_conversation_uses_cached_tags(mock_client):
+    """Should answer a repeated conversation from the cache without calling Gemini"""
+    set_response(mock_client, [make_tag()])
+    tagger = MessageTagger()
+
+    first = asyncio.run(tagger.classify_latest_message(make_conversation("plan my week")))
+    second = asyncio.run(tagger.classify_latest_message(make_conversation("plan my week")))
+
+    assert first == second
+    assert mock_client.aio.models.generate_content.await_count == 1
+
+
+def test_result_cache_evicts_least_recently_used(mock_client):
+    """Should drop the least recently used conversation once the cache is full"""
+    set_response(mock_client, [make_tag()])
+    tagger = MessageTagger()
+
+    with patch.object(message_tagger, "RESULT_CACHE_SIZE", 2):
+        for text in ["first", "second", "first", "third"]:
+            asyncio.run(tagger.classify_latest_message(make_conversation(text)))
+
+    # "first" was refreshed by its cache hit, so "second" is the one evicted
+    expected = [message_tagger._conversation_key(make_conversation(text)) for text in ["first", "third"]]
+    assert list(message_tagger._results) == expected
+    assert mock_client.aio.models.generate_content.await_count == 3
+
+
+def test_fallbacks_and_errors_are_not_cached(mock_client):
+    """Should retry the model after a fallback or an error instead of caching it"""
+    tagger = MessageTagger()
+    conversation = make_conversation("get me fit")
+
+    set_response(mock_client, [make_tag(intent_domain="fitness")])
+    asyncio.run(tagger.classify_latest_message(conversation))
+    mock_client.aio.models.generate_content.side_effect = RuntimeError("API down")
+    asyncio.run(tagger.classify_latest_message(conversation))
+
+    assert message_tagger._results == {}
+    assert mock_client.aio.models.generate_content.await_count == 2
+
+
+def test_cached_tags_cannot_be_mutated(mock_client):
+    """Should not let one caller change the tags another caller receives"""
+    set_response(mock_client, [make_tag()])
+    tags = asyncio.run(MessageTagger().classify_latest_message(make_conversation("plan my week")))
+
+    with pytest.raises(ValidationError):
+        tags[0].intent_domain = "other"
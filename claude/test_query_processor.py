@@ -454,4 +454,32 @@ def test_empty_context_handling():
         assert "workflow" in context_content.lower()
     
     # Run the async test
-    asyncio.run(run_test())
\ No newline at end of file
+    asyncio.run(run_test())
+
+
+def test_query_history_is_windowed():
+    """Should send only the most recent conversation messages to the LLM"""
+    from claude.query_processor import QueryProcessor
+    from claude.session_manager import ChatSession
+
+    mock_llm = AsyncMock()
+    mock_response = Mock()
+    mock_response.content = "Latest answer"
+    mock_llm.ainvoke.return_value = mock_response
+
+    processor = QueryProcessor(llm=mock_llm, max_history_messages=3)
+    session = ChatSession("window_test")
+    for i in range(5):
+        session.add_user_message(f"Question {i}")
+        session.add_ai_message(f"Answer {i}")
+    session.add_user_message("Final question")
+
+    async def run_test():
+        await processor.process_query(session=session)
+
+        call_args = mock_llm.ainvoke.call_args[0][0]
+        # System prompt followed by the last three conversation messages
+        assert [m.content for m in call_args[1:]] == ["Question 4", "Answer 4", "Final question"]
+
+    asyncio.run(run_test())
+
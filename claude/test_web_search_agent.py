@@ -0,0 +1,104 @@
+"""
+Tests for WebSearchAgent caching and rate-limit retries
+
+The search tool is mocked and asyncio.sleep is patched out, so no network calls
+or real backoff delays happen.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from claude import web_search_agent
+from claude.web_search_agent import WebSearchAgent
+
+
+# Fixtures
+@pytest.fixture
+def search_tool():
+    """Fixture for a mocked DuckDuckGo search tool"""
+    tool = Mock()
+    tool.run = Mock(return_value="search results")
+    return tool
+
+
+@pytest.fixture
+def no_sleep():
+    """Patch out backoff sleeps so retry tests run instantly"""
+    with patch.object(web_search_agent.asyncio, "sleep", new=AsyncMock()) as sleep:
+        yield sleep
+
+
+# Tests for the result cache
+def test_repeat_query_within_ttl_skips_tool(search_tool):
+    """Should answer a repeated query from the cache while it is fresh"""
+    agent = WebSearchAgent("exercise", search_tool=search_tool)
+
+    first = asyncio.run(agent.search("Chest exercises"))
+    second = asyncio.run(agent.search("  chest exercises "))
+
+    assert first == second == "search results"
+    assert search_tool.run.call_count == 1
+
+
+def test_expired_entry_searches_again(search_tool):
+    """Should go back to the search tool once the cached entry is older than the TTL"""
+    agent = WebSearchAgent("exercise", search_tool=search_tool, cache_ttl_seconds=60)
+
+    asyncio.run(agent.search("chest exercises"))
+    # Age the cached entry past the TTL
+    stored_at, results = agent._cache["chest exercises"]
+    agent._cache["chest exercises"] = (stored_at - 61, results)
+    asyncio.run(agent.search("chest exercises"))
+
+    assert search_tool.run.call_count == 2
+
+
+def test_failed_search_is_not_cached(search_tool):
+    """Should retry the search tool after a failure instead of caching the error"""
+    search_tool.run.side_effect = [RuntimeError("connection reset"), "search results"]
+    agent = WebSearchAgent("exercise", search_tool=search_tool)
+
+    failed = asyncio.run(agent.search("chest exercises"))
+    succeeded = asyncio.run(agent.search("chest exercises"))
+
+    assert failed.startswith("Search failed:")
+    assert succeeded == "search results"
+    assert search_tool.run.call_count == 2
+
+
+# Tests for rate-limit backoff
+def test_rate_limit_is_retried_until_success(search_tool, no_sleep):
+    """Should back off and retry when DuckDuckGo rate-limits the query"""
+    search_tool.run.side_effect = [RuntimeError("Ratelimit"), RuntimeError("Ratelimit"), "search results"]
+    agent = WebSearchAgent("exercise", search_tool=search_tool, max_retries=2)
+
+    result = asyncio.run(agent.search("chest exercises"))
+
+    assert result == "search results"
+    assert search_tool.run.call_count == 3
+    assert [call.args[0] for call in no_sleep.await_args_list] == [1.0, 2.0]
+
+
+def test_rate_limit_gives_up_after_max_retries(search_tool, no_sleep):
+    """Should stop after max_retries retries and report the failure"""
+    search_tool.run.side_effect = RuntimeError("Ratelimit")
+    agent = WebSearchAgent("exercise", search_tool=search_tool, max_retries=2)
+
+    result = asyncio.run(agent.search("chest exercises"))
+
+    assert result.startswith("Search failed:")
+    assert search_tool.run.call_count == 3
+
+
+def test_other_errors_are_not_retried(search_tool, no_sleep):
+    """Should fail immediately on errors that are not rate limits"""
+    search_tool.run.side_effect = RuntimeError("connection reset")
+    agent = WebSearchAgent("exercise", search_tool=search_tool, max_retries=2)
+
+    result = asyncio.run(agent.search("chest exercises"))
+
+    assert result.startswith("Search failed:")
+    assert search_tool.run.call_count == 1
+    no_sleep.assert_not_awaited()
@@ -6,6 +6,7 @@ and then return routing decisions without handling session management.
 """
 
 import asyncio
+import logging
 from typing import Dict, Any, Optional, TYPE_CHECKING
 
 from message_tagger import MessageTagger
@@ -14,6 +15,12 @@ from google.genai import types
 if TYPE_CHECKING:
     from claude.session_manager import ChatSession
 
+logger = logging.getLogger(__name__)
+
+# Replies accepted as answers to a confirmation prompt
+POSITIVE_CONFIRMATIONS = frozenset(["yes", "y", "confirm", "proceed", "go ahead", "sure", "ok", "okay", "yep", "yeah"])
+NEGATIVE_CONFIRMATIONS = frozenset(["no", "n", "cancel", "stop", "abort", "nope", "nah", "don't"])
+
 
 class TriageAgent:
     """
@@ -21,9 +28,13 @@ class TriageAgent:
     Does not handle session management or WebSocket communication.
     """
     
-    def __init__(self, high_confidence_threshold: float = 0.8):
+    __slots__ = ("message_tagger", "high_confidence_threshold", "max_history_messages")
+    
+    def __init__(self, high_confidence_threshold: float = 0.8, max_history_messages: int = 20):
         self.message_tagger = MessageTagger()
         self.high_confidence_threshold = high_confidence_threshold
+        # Number of recent messages sent to the classifier
+        self.max_history_messages = max_history_messages
     
     async def classify_and_route(self, session_id: str, session: "ChatSession") -> Dict[str, Any]:
         """
@@ -46,9 +57,6 @@ class TriageAgent:
                 "redirect_message": str (optional)
             }
         """
-        # Get conversation history in Gemini format (excluding system messages)
-        conversations = session.get_conversation_for_gemini(include_system=False)
-        
         # Get the latest user message for response generation
         latest_user_msg = session.get_latest_user_message()
         if not latest_user_msg:
@@ -56,6 +64,13 @@ class TriageAgent:
         
         user_message = latest_user_msg.content
         
+        # Blank messages carry no intent, so skip the classifier round-trip
+        if not user_message.strip():
+            return self._create_default_response(user_message)
+        
+        # Read the history only once the turn actually needs classifying
+        conversations = session.get_conversation_for_gemini(include_system=False, limit=self.max_history_messages)
+        
         try:
             # Classify the message
             tags = await self.message_tagger.classify_latest_message(conversations)
@@ -66,7 +81,10 @@ class TriageAgent:
             
             tag = tags[0]  # Use the first/primary tag
             
-            print(f"Triage classification - Domain: {tag.intent_domain}, Type: {tag.intent_type}, Confidence: {tag.confidence_score}")
+            logger.info(
+                "Triage classification - Domain: %s, Type: %s, Confidence: %s",
+                tag.intent_domain, tag.intent_type, tag.confidence_score,
+            )
             
             # High-confidence create request for exercise planning
             if (tag.confidence_score >= self.high_confidence_threshold and 
@@ -107,7 +125,7 @@ class TriageAgent:
                 }
                 
         except Exception as e:
-            print(f"Error in message classification: {e}")
+            logger.exception("Error in message classification for session %s", session_id)
             return self._create_error_response(user_message, str(e))
     
     def _create_default_response(self, user_message: str) -> Dict[str, Any]:
@@ -146,11 +164,11 @@ class TriageAgent:
         message_lower = message.lower().strip()
         
         # Positive confirmations
-        if message_lower in ["yes", "y", "confirm", "proceed", "go ahead", "sure", "ok", "okay", "yep", "yeah"]:
+        if message_lower in POSITIVE_CONFIRMATIONS:
             return "yes"
         
         # Negative confirmations
-        elif message_lower in ["no", "n", "cancel", "stop", "abort", "nope", "nah", "don't"]:
+        elif message_lower in NEGATIVE_CONFIRMATIONS:
             return "no"
         
         # Unclear response
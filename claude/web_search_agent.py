@@ -0,0 +1,69 @@
+"""
+Web Search Agent
+
+Wraps the DuckDuckGo search tool with a short-lived result cache and
+exponential backoff when the search service rate-limits requests.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from langchain_community.tools import DuckDuckGoSearchRun
+
+logger = logging.getLogger(__name__)
+
+
+class WebSearchAgent:
+    def __init__(
+        self,
+        agent_type: str,
+        search_tool: Optional[DuckDuckGoSearchRun] = None,
+        cache_ttl_seconds: float = 900,
+        max_cache_size: int = 256,
+        max_retries: int = 2,
+    ):
+        self.agent_type = agent_type
+        self.search_tool = search_tool or DuckDuckGoSearchRun()
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.max_cache_size = max_cache_size
+        self.max_retries = max_retries
+        # Normalized query -> (stored_at, results), oldest first
+        self._cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+    async def search(self, query: str) -> str:
+        """Perform web search and return results, reusing recent results for the same query"""
+        cache_key = query.strip().lower()
+        cached = self._cache.get(cache_key)
+        if cached and time.monotonic() - cached[0] < self.cache_ttl_seconds:
+            self._cache.move_to_end(cache_key)
+            return cached[1]
+
+        try:
+            logger.info("%s searching for: %s", self.agent_type, query)
+            results = await self._run_with_backoff(query)
+        except Exception as e:
+            logger.exception("Search error in %s", self.agent_type)
+            return f"Search failed: {str(e)}"
+
+        self._cache[cache_key] = (time.monotonic(), results)
+        self._cache.move_to_end(cache_key)
+        if len(self._cache) > self.max_cache_size:
+            self._cache.popitem(last=False)
+        return results
+
+    async def _run_with_backoff(self, query: str) -> str:
+        """Run the search, backing off exponentially when DuckDuckGo rate-limits us"""
+        delay = 1.0
+        for attempt in range(self.max_retries + 1):
+            try:
+                # DuckDuckGoSearchRun.run is blocking network I/O; keep it off the event loop
+                return await asyncio.to_thread(self.search_tool.run, query)
+            except Exception as e:
+                if attempt == self.max_retries or "ratelimit" not in str(e).lower():
+                    raise
+                logger.warning("%s rate limited, retrying in %.0fs", self.agent_type, delay)
+                await asyncio.sleep(delay)
+                delay *= 2